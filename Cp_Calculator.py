@@ -8,7 +8,36 @@
 #               1.  TR-33. "Model Rocket Technical Report: Calculating the Center of Pressure of a Model
 #                   Rocket."  James Barrowman.  EstesEducator.com
 
+import array
+import hashlib
+import heapq
+import json
 import math
+import mmap
+import os
+
+# bitmask flags returned by validate_spec / validate_batch - a value of 0 means the spec passed every check
+ERR_FIN_COUNT = 1                           # number of fins not 3, 4, or 6
+ERR_DIMENSION = 2                           # zero, negative, non-finite, or missing length/diameter/Cg
+ERR_FIN_EXTENT = 4                          # fin root extends past the airframe entered before the fins
+ERR_DIAMETER = 8                            # diameter mismatch between adjacent components
+ERR_NO_NOSE = 16                            # nose cone missing or not the first component
+ERR_NO_BODY = 32                            # no body tube defined
+ERR_NO_FINS = 64                            # no fin set defined
+ERR_CAPSULE = 128                           # capsule base diameter not larger than capsule top diameter
+ERR_COMPONENT = 256                         # unrecognized component type or nose shape
+ERR_TAPER = 512                             # shoulder/boattail small diameter not smaller than large diameter
+ERR_MESSAGES = {ERR_FIN_COUNT: "Number of fins must be 3, 4, or 6.",
+                ERR_DIMENSION: "All lengths and diameters must be positive numbers.",
+                ERR_FIN_EXTENT: "Fins must be located within the rocket sections entered before them.",
+                ERR_DIAMETER: "Diameters of adjacent components must match.",
+                ERR_NO_NOSE: "Rocket must begin with one nose cone.",
+                ERR_NO_BODY: "Rocket must have at least one body tube.",
+                ERR_NO_FINS: "Rocket must have at least one set of fins.",
+                ERR_CAPSULE: "Diameter at base of capsule must be larger than diameter at top of capsule.",
+                ERR_COMPONENT: "Unrecognized component type or nose cone shape.",
+                ERR_TAPER: "Small diameter of a shoulder or boattail must be smaller than its large diameter."}
+DIAM_TOL = 0.001                            # [in] allowable mismatch between adjacent component diameters
 
 class Rocket():
     """
@@ -231,14 +260,10 @@ def find_nose(rocket):
         err_val = validate_input(shape_val, min_val, max_val, err_val)
     shape = ord(shape_val) - 48             # convert to integer value
     Cna_nose = 2                            # this is common to all nose cone shapes per Ref. 1, Sect 4
-    if shape == 1:
-        x_bar = 2/3 * len_nose              # for conical nose per Ref 1, Sect 4
-    elif shape == 2:
-        x_bar = 0.466 * len_nose            # for ogive nose per Ref 1, Sect 4
-    elif shape == 3:
-        x_bar = 0.5 * len_nose              # for parabolic nose per Ref 1, Sect 4
-    else:
+    if shape == 4:
         x_bar = calculate_capsule(len_nose)
+    else:
+        x_bar = calculate_nose(len_nose, shape)
     # update Rocket class with calculated values
     rocket.add_component("Nose", len_nose)
     rocket.add_Cn_alpha(Cna_nose)
@@ -246,6 +271,25 @@ def find_nose(rocket):
     rocket.add_length(len_nose)
     return 0
 
+def calculate_nose(length, shape, diam_base=0, diam_top=0):
+    """
+    Module to calculate xBar of the nose cone from its dimensions without user input
+    :param length: (float) length of nose cone
+    :param shape: (int) 1 = Conical, 2 = Ogive, 3 = Parabolic, 4 = Capsule
+    :param diam_base: (float) diameter of the base of the capsule (capsule only)
+    :param diam_top: (float) diameter at the top of the capsule (capsule only)
+    :return: x_bar
+    """
+    if shape == 1:
+        x_bar = 2/3 * length                # for conical nose per Ref 1, Sect 4
+    elif shape == 2:
+        x_bar = 0.466 * length              # for ogive nose per Ref 1, Sect 4
+    elif shape == 3:
+        x_bar = 0.5 * length                # for parabolic nose per Ref 1, Sect 4
+    else:
+        x_bar = capsule_x_bar(length, diam_base, diam_top)
+    return x_bar
+
 def calculate_capsule(length):
     """
     Module to calculate Cna and xBar of Capsule-shaped nose piece
@@ -261,19 +305,24 @@ def calculate_capsule(length):
         if diam_1_capsule <= diam_2_capsule:
             capsule_err = 1  # set error flag
             print("Error: Diameter at base of capsule must be larger than diameter at top of capsule.")
+    return capsule_x_bar(length, diam_1_capsule, diam_2_capsule)
+
+def capsule_x_bar(length, diam_1_capsule, diam_2_capsule):
+    """
+    Module to calculate xBar of Capsule-shaped nose piece from its dimensions
+    :param length: (float)
+    :param diam_1_capsule: (float) diameter of the base of the capsule
+    :param diam_2_capsule: (float) diameter at the top of the capsule
+    :return: xBar_nose
+    """
     # perform slope-intercept calculation with axis origin at top/center of capsule body
     x_1 = length  # equations per Ref 1, Sect 4 for capsule nose
     x_2 = 0  # top of module based at origin
     y_1 = diam_1_capsule / 2  # y1 = radius of module at body tube
     y_2 = diam_2_capsule / 2  # y2 = radius of module at top of capsule
     slope_m = (y_2 - y_1) / (x_2 - x_1)
-    b_1 = y_1 - slope_m * x_1  # check sum 1
-    b_2 = y_2 - slope_m * x_2  # check sum 2
-    # verify values calculated correctly at each point
-    if b_1 != b_2:
-        print("Error in Capsule inputs.")
-        return 1
-    delta_l = b_1 / slope_m  # length = absolute value of x intercept
+    b_2 = y_2 - slope_m * x_2  # intercept - the top of the capsule is at the origin, so this is exact
+    delta_l = b_2 / slope_m  # length = absolute value of x intercept
     len_equiv_capsule = length + delta_l  # x_bar calculated based on length of equivalent cone length
     x_bar_equiv = 2 / 3 * len_equiv_capsule  # x_bar of this equivalent conical nose
     x_bar = x_bar_equiv - delta_l  # subtract equivalent length
@@ -327,64 +376,93 @@ def find_taper(rocket, taper_type):
         rocket.add_component("Boattail", len_taper)
     # calculate Cna and xBar
     diam_nose = rocket.get_diameter()       # diameter of first body tube defined
-    Cna_taper = 2 * ((diam2_taper / diam_nose)**2 - (diam1_taper / diam_nose)**2 )
-    x_bar = dist_to_taper + (len_taper / 3) * (1 + (1 - diam1_taper / diam2_taper) / (1 - (diam1_taper / diam2_taper)**2))
+    Cna_taper, x_bar = calculate_taper(dist_to_taper, len_taper, diam1_taper, diam2_taper, diam_nose)
     # update Cna, x_bar, and rocket length
     rocket.add_Cn_alpha(Cna_taper)
     rocket.add_x_bar(x_bar)
     rocket.add_length(len_taper)
     return 0
 
+def calculate_taper(dist_to_taper, len_taper, diam1_taper, diam2_taper, diam_nose):
+    """
+    Module to calculate Cna and xBar of a shoulder/boattail from its dimensions without user input
+    :param dist_to_taper: (float) distance from the tip of the nose cone to the top of the taper
+    :param len_taper: (float) length of the taper section
+    :param diam1_taper: (float) diameter at the top of the taper section
+    :param diam2_taper: (float) diameter at the bottom of the taper section
+    :param diam_nose: (float) diameter of the first body tube
+    :return: Cna_taper, x_bar
+    """
+    Cna_taper = 2 * ((diam2_taper / diam_nose)**2 - (diam1_taper / diam_nose)**2 )
+    x_bar = dist_to_taper + (len_taper / 3) * (1 + (1 - diam1_taper / diam2_taper) / (1 - (diam1_taper / diam2_taper)**2))
+    return Cna_taper, x_bar
+
 def find_fins(rocket, diam=0, fin_num=1):
     """
     module to get distance to rocket fins, number, and dimensions from user, calculate area, Cna, and x_bar
     number of fins limited to 3, 4, or 6 fins by governing equations
     fin shape is limited to 3 or 4 points (to be revisited at a later date)
+    fins are re-prompted until they pass validate_fins against the rocket length entered so far
     :param rocket: (object) current class object being calculated
-    :return: 0 or 1
+    :return: 0
     """
     # add basic assumptions - 3 or 4 point fin, tip parallel to root
-    dist_to_fins = float(input("Enter the distance from the forward tip of the nose cone to the upper tip of fins (in inches): "))
-    #                                        # this value is different than rocket length
-    num_fins = int(input("Enter the number of fins on your rocket (must be 3, 4, or 6): "))
-    #                                       # should add validation
-    dim_a = float(input("a: Enter the length of the fin root (where the fin meets the body) in inches: "))
-    # add validation here that dist_to_fins + dim_a <= length of rocket
-    dim_b = float(input("b: Enter the length of the fin along the tip in inches: "))
-    dim_m = float(input("m: Enter the distance from the front of the fin root to the front of the tip in inches: "))
-    dim_s = float(input("s: Enter the length from the fin root to the tip in inches: "))
+    fin_err = 1                             # set error flag
+    while fin_err != 0:
+        dist_to_fins = float(input("Enter the distance from the forward tip of the nose cone to the upper tip of fins (in inches): "))
+        #                                    # this value is different than rocket length
+        num_fins = int(input("Enter the number of fins on your rocket (must be 3, 4, or 6): "))
+        dim_a = float(input("a: Enter the length of the fin root (where the fin meets the body) in inches: "))
+        dim_b = float(input("b: Enter the length of the fin along the tip in inches: "))
+        dim_m = float(input("m: Enter the distance from the front of the fin root to the front of the tip in inches: "))
+        dim_s = float(input("s: Enter the length from the fin root to the tip in inches: "))
+        # check fin count, dimensions, and that dist_to_fins + dim_a <= length of rocket entered so far
+        fins = {"dist": dist_to_fins, "num_fins": num_fins, "a": dim_a, "b": dim_b, "m": dim_m, "s": dim_s}
+        fin_err = validate_fins(fins, rocket.get_length())
+        print_statement(describe_errors(fin_err))
+    if diam == 0:
+        diam = rocket.get_diameter()
+    Cna_fins, x_bar_fins = calculate_fins(dist_to_fins, num_fins, dim_a, dim_b, dim_m, dim_s, diam)
+    # add component, Cna, and x_bar to Rocket
+    fin_id = "Fins_" + str(fin_num)
+    rocket.add_component(fin_id, dist_to_fins)
+    rocket.add_Cn_alpha(Cna_fins)
+    rocket.add_x_bar(x_bar_fins)
+    return 0
+
+def calculate_fins(dist_to_fins, num_fins, dim_a, dim_b, dim_m, dim_s, diam):
+    """
+    Module to calculate Cna and xBar of a fin set from its dimensions without user input
+    number of fins must already be checked to be 3, 4, or 6
+    :param dist_to_fins: (float) distance from the tip of the nose cone to the upper tip of fins
+    :param num_fins: (int) 3, 4, or 6
+    :param dim_a: (float) length of the fin root
+    :param dim_b: (float) length of the fin tip
+    :param dim_m: (float) distance from the front of the fin root to the front of the tip
+    :param dim_s: (float) length from the fin root to the tip (span)
+    :param diam: (float) diameter of the body tube the fins are attached to
+    :return: Cna_fins, x_bar_fins
+    """
     # calculate chord (l) - adjacent = dim_s
     adj = dim_s                             # adjacent edge of triangle
     opp = (dim_b / 2 + dim_m) - (dim_a / 2) # opposite edge of triangle based at intersection of chord and fin root
     chord =  math.sqrt(adj**2 + opp**2)     # calculate long leg of right triangle
-    # calculate Cn_alpha for fin
-    if diam == 0:
-        diam = rocket.get_diameter()
     # calculate Cna of fins per Ref 1, Section 4
     cna_fin_num = 4 * num_fins * (dim_s / diam)**2                              # numerator of Cna equation
     cna_fin_denom = 1 + math.sqrt(1 + ((2 * chord) / (dim_a + dim_b))**2)       # denominator of Cna equation
     cna_fin = cna_fin_num / cna_fin_denom
     # calculate fin interference factor per Ref 1, Sect 4
     rad = diam / 2
-    fin_factor = 1                          # initialize var outside of loop
     if num_fins == 3 or num_fins == 4:
         fin_factor = 1 + rad / (rad + dim_s)
-    elif num_fins == 6:
-        fin_factor = 1 + (0.5 * rad) / (rad + dim_s)
     else:
-        print("Error entering the number of fins.")
-        return 1
+        fin_factor = 1 + (0.5 * rad) / (rad + dim_s)
     Cna_fins = fin_factor * cna_fin
     # calculate x_bar_fin per Ref 1, Sect 4
     x_bar_fin_term_1 = (dim_m * (dim_a + 2 * dim_b)) / (3 * (dim_a + dim_b))
     x_bar_fin_term_2 = (1 / 6) * (dim_a + dim_b - ((dim_a * dim_b) / (dim_a + dim_b)))
     x_bar_fins = dist_to_fins + x_bar_fin_term_1 + x_bar_fin_term_2
-    # add component, Cna, and x_bar to Rocket
-    fin_id = "Fins_" + fin_num
-    rocket.add_component(fin_id, dist_to_fins)
-    rocket.add_Cn_alpha(Cna_fins)
-    rocket.add_x_bar(x_bar_fins)
-    return 0
+    return Cna_fins, x_bar_fins
 
 def find_xbar(rocket):
     """
@@ -461,6 +539,58 @@ def find_Cna(rocket):
         rocket.set_Margin(Cp_margin)
     return 0
 
+def calculate_spec(spec):
+    """
+    Non-interactive counterpart of find_Cna - builds a Rocket from a spec and calculates Cna, xBar, and Cp Margin
+    spec must already pass validate_spec (see validate_spec for the spec format)
+    :param spec: (dict)
+    :return: rocket (object)
+    """
+    rocket = Rocket(spec.get("name", ""))
+    components = spec["components"]
+    for comp in components:                 # first body tube diameter is the reference diameter for Cna
+        if comp["type"] == "Body":
+            rocket.add_diameter(comp["diameter"])
+    body_no = 0
+    fin_no = 0
+    diam_body = rocket.get_diameter()       # fins use the diameter of the body tube above them
+    for comp in components:
+        comp_type = comp["type"]
+        if comp_type == "Nose":
+            x_bar = calculate_nose(comp["length"], comp["shape"], comp.get("base_diam", 0), comp.get("top_diam", 0))
+            rocket.add_component("Nose", comp["length"])
+            rocket.add_Cn_alpha(2)
+            rocket.add_x_bar(x_bar)
+        elif comp_type == "Body":
+            body_no += 1
+            diam_body = comp["diameter"]
+            rocket.add_component("Body_" + str(body_no), comp["length"])
+        elif comp_type == "Fins":
+            fin_no += 1
+            Cna_fins, x_bar = calculate_fins(comp["dist"], comp["num_fins"], comp["a"], comp["b"], comp["m"],
+                                             comp["s"], diam_body)
+            rocket.add_component("Fins_" + str(fin_no), comp["dist"])
+            rocket.add_Cn_alpha(Cna_fins)
+            rocket.add_x_bar(x_bar)
+            continue                        # fins do not add to rocket length
+        else:
+            if comp_type == "Shoulder":
+                diam1_taper, diam2_taper = comp["small_diam"], comp["large_diam"]
+            else:
+                diam1_taper, diam2_taper = comp["large_diam"], comp["small_diam"]
+            Cna_taper, x_bar = calculate_taper(rocket.get_length(), comp["length"], diam1_taper, diam2_taper,
+                                               rocket.get_diameter())
+            rocket.add_component(comp_type, comp["length"])
+            rocket.add_Cn_alpha(Cna_taper)
+            rocket.add_x_bar(x_bar)
+        rocket.add_length(comp["length"])
+    find_xbar(rocket)
+    cg_val = spec.get("cg", 0)
+    if cg_val != 0:
+        rocket.set_CgMax(cg_val)
+        rocket.set_Margin(rocket.get_xBar() - cg_val)
+    return rocket
+
 def print_results(rocket):
     """
     Output results of Cp Calculations to screen for a given Rocket class object
@@ -487,6 +617,150 @@ def print_results(rocket):
         else:
             print("This margin is not acceptable for safety of flight.")
 
+def is_dimension(value, allow_zero=False):
+    """
+    Checks that a dimension is a finite number greater than zero (or zero, if allowed)
+    NaN and infinity fail every check, so they are rejected here rather than passed on for calculation
+    :param value: (int/float)
+    :param allow_zero: (bool)
+    :return: True for a valid dimension, False otherwise
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return False
+    return value >= 0 if allow_zero else value > 0
+
+def validate_fins(fins, length):
+    """
+    Checks the fin count, fin dimensions, and that the fin root lies within the rocket length
+    The extent is checked against the length of the sections entered before the fins, so fins that run onto a
+    boattail must be entered (or listed in a spec) after the boattail
+    :param fins: (dict) Fins component - see validate_spec
+    :param length: (float) length of the rocket sections entered before the fins
+    :return: err_mask (int) - 0 for valid fins, otherwise the ERR_* flags of every check that failed
+    """
+    err_mask = 0
+    try:
+        if fins["num_fins"] not in (3, 4, 6):
+            err_mask |= ERR_FIN_COUNT
+        if not (is_dimension(fins["a"]) and is_dimension(fins["s"]) and is_dimension(fins["b"], True)
+                and is_dimension(fins["m"], True)):
+            err_mask |= ERR_DIMENSION       # b = 0 is a 3-point (triangular) fin
+        if not (is_dimension(fins["dist"], True) and is_dimension(fins["a"])):
+            err_mask |= ERR_DIMENSION
+        elif fins["dist"] + fins["a"] > length:
+            err_mask |= ERR_FIN_EXTENT
+    except KeyError:
+        err_mask |= ERR_DIMENSION           # missing dimension
+    return err_mask
+
+def validate_spec(spec):
+    """
+    Checks a single rocket spec for valid geometry without prompting the user or raising
+    A spec is a dictionary: {"name": str, "cg": float (optional), "components": [dict, ...]} with components listed
+    in order from nose to tail.  Each component dictionary has a "type" key and the keys below (lengths in inches):
+        Nose:       length, shape (1 - 4); capsule (shape 4) also requires base_diam, top_diam
+        Body:       length, diameter
+        Shoulder:   length, small_diam, large_diam
+        Boattail:   length, small_diam, large_diam
+        Fins:       dist (from tip of nose to upper tip of fins), num_fins, a, b, m, s (see find_fins); the fins
+                    must lie within the components listed before them (see validate_fins)
+    cg is measured from the tip of the nose cone; 0 skips the Cp Margin calculation, as in find_Cna
+    :param spec: (dict)
+    :return: err_mask (int) - 0 for valid spec, otherwise the ERR_* flags of every check that failed
+    """
+    if not isinstance(spec, dict) or not isinstance(spec.get("components", []), (list, tuple)):
+        return ERR_COMPONENT
+    err_mask = 0
+    if "cg" in spec and not is_dimension(spec["cg"], True):
+        err_mask |= ERR_DIMENSION           # Cg of 0 skips the Cp Margin calculation
+    components = spec.get("components", [])
+    length = 0                              # [in] running rocket length
+    prev_diam = 0                           # [in] diameter at the bottom of the previous component (0 = unknown)
+    has_body = False
+    has_fins = False
+    if not components or not isinstance(components[0], dict) or components[0].get("type") != "Nose":
+        err_mask |= ERR_NO_NOSE
+    for index, comp in enumerate(components):
+        if not isinstance(comp, dict):
+            err_mask |= ERR_COMPONENT
+            continue
+        comp_type = comp.get("type")
+        if comp_type not in ("Nose", "Body", "Shoulder", "Boattail", "Fins"):
+            err_mask |= ERR_COMPONENT
+            continue
+        if comp_type == "Fins":
+            has_fins = True                 # fins do not add to rocket length
+            err_mask |= validate_fins(comp, length)
+            continue
+        try:
+            comp_len = comp["length"]
+            if is_dimension(comp_len):
+                length += comp_len
+            else:
+                err_mask |= ERR_DIMENSION
+            if comp_type == "Nose":
+                if index != 0:
+                    err_mask |= ERR_NO_NOSE
+                if comp["shape"] not in (1, 2, 3, 4):
+                    err_mask |= ERR_COMPONENT
+                elif comp["shape"] == 4:
+                    if not (is_dimension(comp["base_diam"]) and is_dimension(comp["top_diam"])):
+                        err_mask |= ERR_DIMENSION
+                    elif comp["base_diam"] <= comp["top_diam"]:
+                        err_mask |= ERR_CAPSULE
+                    prev_diam = comp["base_diam"]
+                continue
+            if comp_type == "Body":
+                top_diam = bottom_diam = comp["diameter"]
+                has_body = True
+            elif comp_type == "Shoulder":
+                top_diam, bottom_diam = comp["small_diam"], comp["large_diam"]
+            else:
+                top_diam, bottom_diam = comp["large_diam"], comp["small_diam"]
+            if not (is_dimension(top_diam) and is_dimension(bottom_diam)):
+                err_mask |= ERR_DIMENSION
+                prev_diam = 0               # continuity cannot be checked against a bad diameter
+                continue
+            if comp_type != "Body" and comp["small_diam"] >= comp["large_diam"]:
+                err_mask |= ERR_TAPER       # equal diameters divide by zero in the taper x_bar equation
+            if is_dimension(prev_diam) and abs(top_diam - prev_diam) > DIAM_TOL:
+                err_mask |= ERR_DIAMETER
+            prev_diam = bottom_diam
+        except KeyError:
+            err_mask |= ERR_DIMENSION       # missing dimension
+    if not has_body:
+        err_mask |= ERR_NO_BODY
+    if not has_fins:
+        err_mask |= ERR_NO_FINS
+    return err_mask
+
+def validate_batch(specs):
+    """
+    Screens a batch of rocket specs in a single pass - see validate_spec for the spec format
+    :param specs: (iterable) rocket spec dictionaries
+    :return: (list) err_mask for each spec, in the same order as the specs
+    """
+    return [validate_spec(spec) for spec in specs]
+
+def filter_valid(specs, masks=None):
+    """
+    Removes specs that failed validation so that only valid geometry is passed on for calculation
+    :param specs: (list) rocket spec dictionaries
+    :param masks: (list) err_mask for each spec from validate_batch; computed if not given
+    :return: (list) specs with an err_mask of 0
+    """
+    if masks is None:
+        masks = validate_batch(specs)
+    return [spec for spec, mask in zip(specs, masks) if mask == 0]
+
+def describe_errors(err_mask):
+    """
+    Converts an err_mask from validate_spec into a list of readable error messages
+    :param err_mask: (int)
+    :return: (list) error message strings, empty if err_mask is 0
+    """
+    return [message for flag, message in ERR_MESSAGES.items() if err_mask & flag]
+
 def validate_input(value, min_val, max_val, err_code):
     """
     Takes an unknown input and verifies that it is a single-digit integer within a given range
@@ -515,6 +789,248 @@ def print_statement(statement):
     for line in statement:
         print(line)
 
+#########################################  Begin Sweep Modules  ###################################################
+
+# columns of each row written to the sweep output file (8-byte native floats, NaN for specs that fail validation)
+SWEEP_COLUMNS = ("Cna", "xBar", "Margin", "Fin_Area")
+COL_CNA = 0
+COL_XBAR = 1
+COL_MARGIN = 2
+COL_FIN_AREA = 3
+ROW_BYTES = len(SWEEP_COLUMNS) * 8
+
+class TopK():
+    """
+    streaming reducer that keeps the k rows with the largest (or smallest) value in one column
+    """
+    def __init__(self, k, column=COL_MARGIN, largest=True):
+        """
+        :param k:       (int) number of rows to keep (k < 1 keeps none)
+        :param column:  (int) column to rank rows by (COL_* value)
+        :param largest: (bool) True to keep the largest values, False to keep the smallest
+        """
+        self._k = k
+        self._column = column
+        self._sign = 1 if largest else -1
+        self._heap = []                     # min-heap of (signed value, -index, row) - worst kept row on top
+
+    def update(self, index, row):
+        """
+        Offers one sweep row to the reducer; rows with a NaN in the ranked column are ignored
+        :param index: (int) sweep index of the row
+        :param row: (tuple) row values in SWEEP_COLUMNS order
+        :return: none
+        """
+        value = row[self._column]
+        if self._k < 1 or math.isnan(value):
+            return                          # nothing to keep, or nothing to rank by
+        entry = (self._sign * value, -index, tuple(row))    # ties go to the lower sweep index
+        if len(self._heap) < self._k:
+            heapq.heappush(self._heap, entry)
+        elif entry > self._heap[0]:
+            heapq.heapreplace(self._heap, entry)
+
+    def get_results(self):
+        """
+        Returns the kept rows, best first
+        :return: (list) of (index, row)
+        """
+        return [(-entry[1], entry[2]) for entry in sorted(self._heap, reverse=True)]
+
+class ParetoFront():
+    """
+    streaming reducer that keeps the rows not dominated on (largest Cp Margin, smallest fin area)
+    """
+    def __init__(self):
+        self._front = []                    # list of (index, row) on the current front
+
+    def update(self, index, row):
+        """
+        Offers one sweep row to the reducer; rows without a Cp Margin are ignored
+        :param index: (int) sweep index of the row
+        :param row: (tuple) row values in SWEEP_COLUMNS order
+        :return: none
+        """
+        margin = row[COL_MARGIN]
+        area = row[COL_FIN_AREA]
+        if math.isnan(margin) or math.isnan(area):
+            return
+        for kept_index, kept in self._front:
+            if kept[COL_MARGIN] >= margin and kept[COL_FIN_AREA] <= area:
+                return                      # dominated by (or equal to) a row already on the front
+        self._front = [(kept_index, kept) for kept_index, kept in self._front
+                       if not (margin >= kept[COL_MARGIN] and area <= kept[COL_FIN_AREA])]
+        self._front.append((index, tuple(row)))
+
+    def get_results(self):
+        """
+        Returns the rows on the front, ordered by fin area
+        :return: (list) of (index, row)
+        """
+        return sorted(self._front, key=lambda item: item[1][COL_FIN_AREA])
+
+def sweep_size(params):
+    """
+    Returns the number of specs in a parameter sweep
+    :param params: (list) of (component index, key, list of values)
+    :return: (int)
+    """
+    size = 1
+    for comp_index, key, values in params:
+        size *= len(values)
+    return size
+
+def sweep_spec(base_spec, params, index):
+    """
+    Builds the spec at a given sweep index without enumerating the ones before it
+    The last parameter in params changes fastest.  A component index of None sweeps a spec key, ex: "cg".
+    :param base_spec: (dict) rocket spec that the swept values are substituted into
+    :param params: (list) of (component index, key, list of values), ex: [(3, "s", [1.0, 1.2, 1.4])]
+    :param index: (int) 0 to sweep_size(params) - 1
+    :return: (dict) spec
+    """
+    spec = dict(base_spec)
+    spec["components"] = [dict(comp) for comp in base_spec["components"]]
+    for comp_index, key, values in reversed(params):
+        index, value_no = divmod(index, len(values))
+        if comp_index is None:
+            spec[key] = values[value_no]
+        else:
+            spec["components"][comp_index][key] = values[value_no]
+    return spec
+
+def calculate_row(spec):
+    """
+    Calculates one sweep output row for a spec
+    :param spec: (dict)
+    :return: (tuple) row values in SWEEP_COLUMNS order
+    """
+    nan = float("nan")
+    if validate_spec(spec) != 0:
+        return nan, nan, nan, nan
+    rocket = calculate_spec(spec)
+    margin = rocket.get_Margin() if rocket.get_CgMax() != 0 else nan
+    fin_area = 0                            # [in^2] total area of all fins (trapezoid area * number of fins)
+    for comp in spec["components"]:
+        if comp["type"] == "Fins":
+            fin_area += comp["num_fins"] * (comp["a"] + comp["b"]) / 2 * comp["s"]
+    return rocket.get_Cna(), rocket.get_xBar(), margin, fin_area
+
+def sweep_fingerprint(base_spec, params):
+    """
+    Returns a fingerprint of a sweep definition so that a checkpoint is only resumed by the sweep that wrote it
+    :param base_spec: (dict)
+    :param params: (list) of (component index, key, list of values)
+    :return: (string) sha256 hex digest
+    """
+    definition = json.dumps([base_spec, params], sort_keys=True)
+    return hashlib.sha256(definition.encode("utf-8")).hexdigest()
+
+def load_checkpoint(ckpt_path, fingerprint, chunk_size):
+    """
+    Reads the number of the next chunk to calculate for a sweep (chunks are completed in order)
+    :param ckpt_path: (string)
+    :param fingerprint: (string) sweep_fingerprint of the sweep being run
+    :param chunk_size: (int) expected number of rows per chunk
+    :return: (int) next chunk number, or None if the checkpoint belongs to a different sweep
+    """
+    if not os.path.exists(ckpt_path):
+        return 0
+    with open(ckpt_path) as infile:
+        ckpt = json.load(infile)
+    if ckpt.get("fingerprint") != fingerprint or ckpt.get("chunk_size") != chunk_size:
+        return None
+    return ckpt["next_chunk"]
+
+def save_checkpoint(ckpt_path, fingerprint, chunk_size, next_chunk):
+    """
+    Writes the number of the next chunk to calculate for a sweep; replaces the old file in one step so that a killed
+    run never leaves a partial checkpoint behind
+    :param ckpt_path: (string)
+    :param fingerprint: (string) sweep_fingerprint of the sweep being run
+    :param chunk_size: (int)
+    :param next_chunk: (int) every chunk before this one is complete
+    :return: none
+    """
+    tmp_path = ckpt_path + ".tmp"
+    with open(tmp_path, "w") as outfile:
+        json.dump({"fingerprint": fingerprint, "chunk_size": chunk_size, "next_chunk": next_chunk}, outfile)
+        outfile.flush()
+        os.fsync(outfile.fileno())
+    os.replace(tmp_path, ckpt_path)
+
+def run_sweep(base_spec, params, out_path, chunk_size=10000, reducers=()):
+    """
+    Calculates every spec in a parameter sweep one chunk at a time and writes the rows to a memory-mapped file
+    The next chunk to calculate is recorded in out_path + ".ckpt"; running again with the same arguments skips the
+    completed chunks, so a killed run resumes where it stopped.  Rows from skipped chunks are read back from the file
+    and passed to the reducers, so the reducers always see the full sweep without holding it in memory.
+    :param base_spec: (dict) rocket spec that the swept values are substituted into
+    :param params: (list) of (component index, key, list of values) - see sweep_spec
+    :param out_path: (string) output file, num_rows * len(SWEEP_COLUMNS) floats
+    :param chunk_size: (int) number of rows calculated between checkpoints
+    :param reducers: (iterable) objects with an update(index, row) method, ex: TopK, ParetoFront
+    :return: 0 (no errors) or 1 (errors)
+    """
+    num_rows = sweep_size(params)
+    if num_rows == 0:
+        print("Error: sweep has no values to calculate.")
+        return 1
+    if chunk_size < 1:
+        print("Error: chunk size must be at least 1 row.")
+        return 1
+    ckpt_path = out_path + ".ckpt"
+    fingerprint = sweep_fingerprint(base_spec, params)
+    next_chunk = load_checkpoint(ckpt_path, fingerprint, chunk_size)
+    if next_chunk is None:
+        print("Error: checkpoint", ckpt_path, "belongs to a different sweep.  Delete it to start over.")
+        return 1
+    if next_chunk == 0 or not os.path.exists(out_path) or os.path.getsize(out_path) != num_rows * ROW_BYTES:
+        # start over - reset the checkpoint before anything is calculated so no stale chunk is trusted
+        next_chunk = 0
+        save_checkpoint(ckpt_path, fingerprint, chunk_size, next_chunk)
+        with open(out_path, "wb") as outfile:
+            outfile.truncate(num_rows * ROW_BYTES)      # preallocate output file
+    num_chunks = (num_rows + chunk_size - 1) // chunk_size
+    num_cols = len(SWEEP_COLUMNS)
+    with open(out_path, "r+b") as outfile:
+        with mmap.mmap(outfile.fileno(), num_rows * ROW_BYTES) as out_map:
+            for chunk in range(num_chunks):
+                start = chunk * chunk_size
+                stop = min(start + chunk_size, num_rows)
+                values = array.array("d")
+                if chunk < next_chunk:
+                    values.frombytes(out_map[start * ROW_BYTES:stop * ROW_BYTES])
+                else:
+                    for index in range(start, stop):
+                        values.extend(calculate_row(sweep_spec(base_spec, params, index)))
+                    out_map[start * ROW_BYTES:stop * ROW_BYTES] = values.tobytes()
+                    # rows must be on disk before the chunk is marked complete - flush offset must be page aligned
+                    flush_start = start * ROW_BYTES // mmap.ALLOCATIONGRANULARITY * mmap.ALLOCATIONGRANULARITY
+                    out_map.flush(flush_start, stop * ROW_BYTES - flush_start)
+                    save_checkpoint(ckpt_path, fingerprint, chunk_size, chunk + 1)
+                for index in range(start, stop):
+                    offset = (index - start) * num_cols
+                    row = tuple(values[offset:offset + num_cols])
+                    for reducer in reducers:
+                        reducer.update(index, row)
+    return 0
+
+def read_sweep_rows(out_path, start, stop):
+    """
+    Reads a range of rows from a sweep output file without loading the rest of the file
+    :param out_path: (string)
+    :param start: (int) first sweep index to read
+    :param stop: (int) sweep index to stop before
+    :return: (list) of rows in SWEEP_COLUMNS order
+    """
+    num_cols = len(SWEEP_COLUMNS)
+    values = array.array("d")
+    with open(out_path, "rb") as infile:
+        infile.seek(start * ROW_BYTES)
+        values.frombytes(infile.read((stop - start) * ROW_BYTES))
+    return [tuple(values[offset:offset + num_cols]) for offset in range(0, len(values), num_cols)]
+
 def main():
     """
     Primary function to introduce program, collect user input, and call modules for calculation
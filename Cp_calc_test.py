@@ -4,6 +4,9 @@
 
 from unittest import TestCase
 from unittest import mock
+import copy
+import os
+import tempfile
 import Cp_Calculator
 
 class TestRocketClass(TestCase):
@@ -112,3 +115,255 @@ class TestRocketClass(TestCase):
         self.assertEqual(rocket.get_length(), 10)
         self.assertAlmostEqual(rocket.get_Cna(), 38.595, 3)
         self.assertAlmostEqual(rocket.get_xBar(), 9.161, 3)
+
+
+# spec equivalent of the inputs in TestRocketClass.test_basic_rocket, with a Cg for the Cp Margin
+BASIC_SPEC = {"name": "Test 1", "cg": 7.0,
+              "components": [{"type": "Nose", "length": 2.5, "shape": 1},
+                             {"type": "Body", "length": 7.5, "diameter": 0.5},
+                             {"type": "Fins", "dist": 9.0, "num_fins": 4, "a": 1.0, "b": 0.6, "m": 0.8, "s": 1.2}]}
+
+
+class TestValidateBatch(TestCase):
+    """
+    verify batch geometry validation returns the correct error flags for each spec
+    """
+    def test_valid_spec(self):
+        """
+        verify a valid spec returns no errors
+        """
+        self.assertEqual(Cp_Calculator.validate_spec(copy.deepcopy(BASIC_SPEC)), 0)
+
+    def test_fin_errors(self):
+        """
+        verify fin count and fin extent checks
+        """
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"][2]["num_fins"] = 5
+        spec["components"][2]["dist"] = 10.0
+        mask = Cp_Calculator.validate_spec(spec)
+        self.assertEqual(mask, Cp_Calculator.ERR_FIN_COUNT | Cp_Calculator.ERR_FIN_EXTENT)
+
+    def test_diameter_errors(self):
+        """
+        verify diameter continuity, capsule, and positive dimension checks
+        """
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"][0] = {"type": "Nose", "length": 3, "shape": 4, "base_diam": 1.25, "top_diam": 2.5}
+        spec["components"].insert(2, {"type": "Boattail", "length": 0.5, "small_diam": -0.8, "large_diam": 0.5})
+        mask = Cp_Calculator.validate_spec(spec)
+        self.assertEqual(mask, Cp_Calculator.ERR_CAPSULE | Cp_Calculator.ERR_DIAMETER | Cp_Calculator.ERR_DIMENSION)
+
+    def test_taper_errors(self):
+        """
+        verify a taper that does not taper is flagged separately from non-positive dimensions
+        """
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"].insert(2, {"type": "Boattail", "length": 0.5, "small_diam": 0.5, "large_diam": 0.5})
+        mask = Cp_Calculator.validate_spec(spec)
+        self.assertEqual(mask, Cp_Calculator.ERR_TAPER)
+        self.assertEqual(Cp_Calculator.describe_errors(mask), [Cp_Calculator.ERR_MESSAGES[Cp_Calculator.ERR_TAPER]])
+
+    def test_fin_extent_order(self):
+        """
+        verify fin extent is checked against the sections listed before the fins, as in find_fins
+        """
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"][2]["dist"] = 9.3
+        spec["components"].append({"type": "Boattail", "length": 0.5, "small_diam": 0.3, "large_diam": 0.5})
+        self.assertEqual(Cp_Calculator.validate_spec(spec), Cp_Calculator.ERR_FIN_EXTENT)
+        spec["components"].insert(2, spec["components"].pop())
+        self.assertEqual(Cp_Calculator.validate_spec(spec), 0)
+
+    def test_missing_components(self):
+        """
+        verify required nose, body, and fins checks
+        """
+        spec = {"name": "Test 2", "components": [{"type": "Boattail", "length": 0.5, "small_diam": 0.8,
+                                                 "large_diam": 1.0}]}
+        mask = Cp_Calculator.validate_spec(spec)
+        self.assertEqual(mask, Cp_Calculator.ERR_NO_NOSE | Cp_Calculator.ERR_NO_BODY | Cp_Calculator.ERR_NO_FINS)
+        self.assertEqual(len(Cp_Calculator.describe_errors(mask)), 3)
+
+    def test_nan_dimensions(self):
+        """
+        verify NaN and infinite dimensions are rejected
+        """
+        for index, key in ((1, "length"), (1, "diameter"), (2, "s"), (2, "dist")):
+            spec = copy.deepcopy(BASIC_SPEC)
+            spec["components"][index][key] = float("nan")
+            self.assertTrue(Cp_Calculator.validate_spec(spec) & Cp_Calculator.ERR_DIMENSION, key)
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"][0]["length"] = float("inf")
+        self.assertTrue(Cp_Calculator.validate_spec(spec) & Cp_Calculator.ERR_DIMENSION)
+        for cg_val in (float("nan"), float("inf"), -1.0):
+            spec = copy.deepcopy(BASIC_SPEC)
+            spec["cg"] = cg_val
+            self.assertEqual(Cp_Calculator.validate_spec(spec), Cp_Calculator.ERR_DIMENSION, cg_val)
+
+    def test_malformed_spec(self):
+        """
+        verify malformed specs and unknown components are flagged instead of raising
+        """
+        self.assertEqual(Cp_Calculator.validate_spec({"components": None}), Cp_Calculator.ERR_COMPONENT)
+        self.assertEqual(Cp_Calculator.validate_spec(None), Cp_Calculator.ERR_COMPONENT)
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"].insert(2, "Body")
+        self.assertEqual(Cp_Calculator.validate_spec(spec), Cp_Calculator.ERR_COMPONENT)
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["components"].insert(2, {"type": "Launch Lug"})
+        self.assertEqual(Cp_Calculator.validate_spec(spec), Cp_Calculator.ERR_COMPONENT)
+        spec = copy.deepcopy(BASIC_SPEC)
+        spec["cg"] = "7"
+        self.assertEqual(Cp_Calculator.validate_spec(spec), Cp_Calculator.ERR_DIMENSION)
+
+    @mock.patch('Cp_Calculator.input', create=True)
+    def test_find_fins_invalid(self, mocked_input):
+        """
+        verify find_fins re-prompts after an invalid fin count and fins extending past the rocket
+        :param mocked_input: (patch)
+        """
+        rocket = Cp_Calculator.Rocket("Test 3")
+        rocket.add_diameter(0.5)
+        rocket.add_length(10)
+        mocked_input.side_effect = ['9.0', '5', '1.0', '0.6', '0.8', '1.20',
+                                    '9.5', '4', '1.0', '0.6', '0.8', '1.20',
+                                    '9.0', '4', '1.0', '0.6', '0.8', '1.20']
+        self.assertEqual(Cp_Calculator.find_fins(rocket), 0)
+        self.assertEqual(mocked_input.call_count, 18)
+        self.assertEqual(len(rocket.get_Cn_alpha()), 1)
+
+    def test_batch_filter(self):
+        """
+        verify validate_batch masks each row and filter_valid removes the failed rows
+        """
+        good = copy.deepcopy(BASIC_SPEC)
+        bad = copy.deepcopy(BASIC_SPEC)
+        bad["components"][1]["length"] = 0
+        masks = Cp_Calculator.validate_batch([good, bad, good])
+        self.assertEqual(masks, [0, Cp_Calculator.ERR_DIMENSION | Cp_Calculator.ERR_FIN_EXTENT, 0])
+        self.assertEqual(Cp_Calculator.filter_valid([good, bad, good], masks), [good, good])
+
+
+class TestSweep(TestCase):
+    """
+    verify non-interactive spec calculation, chunked sweep output with resume, and streaming reducers
+    """
+    def test_calculate_spec(self):
+        """
+        verify calculate_spec matches the interactive calculation
+        """
+        rocket = Cp_Calculator.calculate_spec(BASIC_SPEC)
+        self.assertEqual(rocket.get_length(), 10)
+        self.assertAlmostEqual(rocket.get_Cna(), 38.595, 3)
+        self.assertAlmostEqual(rocket.get_xBar(), 9.161, 3)
+        self.assertAlmostEqual(rocket.get_Margin(), 2.161, 3)
+
+    def test_sweep_spec(self):
+        """
+        verify sweep indices map to parameter values with the last parameter changing fastest
+        """
+        params = [(2, "num_fins", [3, 4, 5]), (2, "s", [1.0, 1.2])]
+        self.assertEqual(Cp_Calculator.sweep_size(params), 6)
+        spec = Cp_Calculator.sweep_spec(BASIC_SPEC, params, 3)
+        self.assertEqual(spec["components"][2]["num_fins"], 4)
+        self.assertEqual(spec["components"][2]["s"], 1.2)
+        self.assertEqual(BASIC_SPEC["components"][2]["s"], 1.2)
+
+    def test_run_sweep_resume(self):
+        """
+        verify a killed sweep resumes from its checkpoint and produces the same rows and reducer results
+        """
+        params = [(2, "num_fins", [3, 4, 5, 6]), (2, "s", [0.8, 1.0, 1.2]), (2, "a", [0.5, 1.0])]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            full_path = os.path.join(tmp_dir, "full.dat")
+            full_top = Cp_Calculator.TopK(3)
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, full_path, 5, [full_top]), 0)
+            rows = Cp_Calculator.read_sweep_rows(full_path, 0, 24)
+            self.assertEqual(len(rows), 24)
+            self.assertTrue(all(row[0] != row[0] for row in rows[12:18]))     # 5 fins fail validation (NaN)
+            # stop the run partway through the third chunk
+            part_path = os.path.join(tmp_dir, "part.dat")
+            killer = mock.Mock()
+            killer.update.side_effect = lambda index, row: index == 12 and 1 / 0
+            with self.assertRaises(ZeroDivisionError):
+                Cp_Calculator.run_sweep(BASIC_SPEC, params, part_path, 5, [killer])
+            part_top = Cp_Calculator.TopK(3)
+            with mock.patch("Cp_Calculator.calculate_row", wraps=Cp_Calculator.calculate_row) as calc:
+                self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, part_path, 5, [part_top]), 0)
+            self.assertEqual(calc.call_count, 9)                # only chunks 3 and 4 recalculated
+            self.assertEqual(Cp_Calculator.read_sweep_rows(part_path, 0, 24)[:12], rows[:12])
+            self.assertEqual(part_top.get_results(), full_top.get_results())
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, part_path, 4), 1)
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, part_path, 0), 1)
+
+    def test_run_sweep_different_sweep(self):
+        """
+        verify a checkpoint is not resumed by a sweep with different values or base spec of the same size
+        """
+        params = [(2, "s", [0.8, 1.0, 1.2, 1.4])]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = os.path.join(tmp_dir, "out.dat")
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, out_path, 2), 0)
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, [(2, "s", [5.0] * 4)], out_path, 2), 1)
+            spec = copy.deepcopy(BASIC_SPEC)
+            spec["cg"] = 6.0
+            self.assertEqual(Cp_Calculator.run_sweep(spec, params, out_path, 2), 1)
+
+    def test_run_sweep_stale_checkpoint(self):
+        """
+        verify a checkpoint is reset when the output file is deleted, even if the next run is killed right away
+        """
+        params = [(2, "s", [0.8, 1.0, 1.2, 1.4]), (2, "a", [0.5, 1.0])]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = os.path.join(tmp_dir, "out.dat")
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, out_path, 2), 0)
+            rows = Cp_Calculator.read_sweep_rows(out_path, 0, 8)
+            os.remove(out_path)
+            with mock.patch("Cp_Calculator.calculate_row", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    Cp_Calculator.run_sweep(BASIC_SPEC, params, out_path, 2)
+            top = Cp_Calculator.TopK(8)
+            with mock.patch("Cp_Calculator.calculate_row", wraps=Cp_Calculator.calculate_row) as calc:
+                self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, out_path, 2, [top]), 0)
+            self.assertEqual(calc.call_count, 8)
+            self.assertEqual(Cp_Calculator.read_sweep_rows(out_path, 0, 8), rows)
+            self.assertNotIn((0.0, 0.0, 0.0, 0.0), [row for index, row in top.get_results()])
+
+    def test_run_sweep_bad_cg(self):
+        """
+        verify an invalid swept Cg is written as a NaN row instead of stopping the sweep
+        """
+        params = [(None, "cg", [7.0, "7", float("nan"), 0])]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            out_path = os.path.join(tmp_dir, "out.dat")
+            self.assertEqual(Cp_Calculator.run_sweep(BASIC_SPEC, params, out_path, 3), 0)
+            rows = Cp_Calculator.read_sweep_rows(out_path, 0, 4)
+            self.assertAlmostEqual(rows[0][Cp_Calculator.COL_MARGIN], 2.161, 3)
+            self.assertTrue(all(value != value for row in rows[1:3] for value in row))
+            self.assertAlmostEqual(rows[3][Cp_Calculator.COL_XBAR], 9.161, 3)
+            self.assertTrue(rows[3][Cp_Calculator.COL_MARGIN] != rows[3][Cp_Calculator.COL_MARGIN])
+
+    def test_capsule_nose(self):
+        """
+        verify capsule noses that failed the old exact check sum are calculated instead of returning 1
+        """
+        self.assertAlmostEqual(Cp_Calculator.calculate_nose(2.5, 4, 1.0, 0.3), 1.310, 3)
+
+    def test_reducers(self):
+        """
+        verify TopK keeps the best rows and ParetoFront drops dominated rows
+        """
+        nan = float("nan")
+        rows = [(1, 1, 2.0, 4.0), (1, 1, 3.0, 4.0), (1, 1, 1.0, 1.0), (1, 1, 2.0, 5.0), (nan, nan, nan, nan)]
+        top = Cp_Calculator.TopK(2)
+        front = Cp_Calculator.ParetoFront()
+        for index, row in enumerate(rows):
+            top.update(index, row)
+            front.update(index, row)
+        self.assertEqual([index for index, row in top.get_results()], [1, 0])
+        for k in (0, -1):
+            empty = Cp_Calculator.TopK(k)
+            empty.update(0, rows[0])
+            self.assertEqual(empty.get_results(), [])
+        self.assertEqual([index for index, row in front.get_results()], [2, 1])